@@ -17,11 +17,58 @@ from geostat_toolkit import (
     save_samples_to_csv
 )
 
+# Figure reused across repeated main() calls (parameter sweeps)
+_FIG, _AXES = None, None
+_CBARS = []
+
 def load_config(config_path):
     with open(config_path, 'r') as file:
         return yaml.safe_load(file)
 
-def main():
+def sample_flat_indices(rng, n_cells, n_samples):
+    """Draw n_samples unique flat indices uniformly from [0, n_cells).
+
+    Below 1% of the grid, candidates are drawn with rng.integers and
+    deduplicated keeping first-draw order, so truncating to n_samples stays
+    uniform (a sorted np.unique(...)[:n] would favour low indices). The loop
+    terminates because n_samples is far below n_cells. At 1% or more it
+    falls back to rng.choice(replace=False).
+    """
+    if n_samples < 0.01 * n_cells:
+        flat_idx = np.empty(0, dtype=np.int64)
+        while len(flat_idx) < n_samples:
+            cand = np.concatenate([flat_idx, rng.integers(0, n_cells, size=2 * n_samples)])
+            # Keep draw order so the truncation stays uniform
+            _, first = np.unique(cand, return_index=True)
+            flat_idx = cand[np.sort(first)][:n_samples]
+        return flat_idx
+    return rng.choice(n_cells, size=n_samples, replace=False)
+
+def get_figure():
+    global _FIG, _AXES
+    if _FIG is None:
+        _FIG, _AXES = plt.subplots(1, 3, figsize=(15, 5))
+    else:
+        for cbar in _CBARS:
+            cbar.remove()
+        _CBARS.clear()
+        # tight_layout rewrote the subplot params and colorbars shrank the axes;
+        # restore both so every run lays out like a fresh figure
+        _FIG.subplots_adjust(**{k: plt.rcParams['figure.subplot.' + k]
+                                for k in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')})
+        for ax in _AXES:
+            ax.clear()
+            ax.set_position(ax.get_subplotspec().get_position(_FIG))
+    return _FIG, _AXES, _CBARS
+
+def release_figure():
+    global _FIG, _AXES
+    if _FIG is not None:
+        plt.close(_FIG)
+    _FIG, _AXES = None, None
+    _CBARS.clear()
+
+def main(batch=False):
     # 1. Load Config
     cfg = load_config(os.path.join(current_dir, 'demo_config.yaml'))
     dom = cfg['domain']
@@ -41,11 +88,11 @@ def main():
     print("Sampling...")
     rng = np.random.default_rng(cfg['sampling']['seed'])
     # Sample unique points
-    flat_idx = rng.choice(dom['nx']*dom['ny'], size=cfg['sampling']['n_samples'], replace=False)
+    flat_idx = sample_flat_indices(rng, dom['nx']*dom['ny'], cfg['sampling']['n_samples'])
     idx_y, idx_x = np.divmod(flat_idx, dom['nx'])
     
     sx, sy = x[idx_x], y[idx_y]
-    s_vals = truth[idx_y, idx_x]
+    s_vals = np.take(truth.ravel(), flat_idx, mode='clip')
 
     # 4. Kriging
     user_model = cfg['kriging'].get('variogram_model')
@@ -88,19 +135,25 @@ def main():
     
     # 6. Plot
     print("Plotting...")
-    fig, axes = plt.subplots(1, 3, figsize=(15, 5))
+    fig, axes, cbars = get_figure()
     titles = ["Ground Truth", "Prediction", "Variance"]
     fields = [truth, pred, var]
+    # Downsample large grids to at most 1024 cells per axis
+    stride = max(1, -(-max(truth.shape) // 1024))
     
     for ax, field, title in zip(axes, fields, titles):
-        im = ax.imshow(field, origin='lower', extent=[0, dom['x_max'], 0, dom['y_max']], cmap='viridis')
+        im = ax.imshow(field[::stride, ::stride], origin='lower', extent=[0, dom['x_max'], 0, dom['y_max']],
+                       cmap='viridis', interpolation='nearest')
         ax.set_title(title)
-        plt.colorbar(im, ax=ax)
+        cbars.append(fig.colorbar(im, ax=ax))
     
     axes[0].scatter(sx, sy, c='red', s=10, label='Samples')
     
-    plt.tight_layout()
-    plt.savefig(os.path.join(out_dir, cfg['output']['plot_filename']))
+    fig.tight_layout()
+    fig.savefig(os.path.join(out_dir, cfg['output']['plot_filename']), dpi=100)
+    # Keep the figure alive between calls in batch mode
+    if not batch:
+        release_figure()
     print("Done.")
 
 if __name__ == "__main__":